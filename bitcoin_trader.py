@@ -4,15 +4,57 @@ Bitcoin trading script for AlgoTrader
 
 import os
 import argparse
+import csv
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import numpy as np
-import pandas as pd
-import requests
+import urllib3
+from urllib.parse import urlencode
 
 from src.api.trading import AlpacaTradingClient
+from src.api.streaming import AlpacaTradeUpdatesStream, CoinbaseTradeStream
 from src.strategy.rsi_strategy import RSIStrategy
+from src.utils import fastjson
+
+TRADE_LOG_PATH = "btc_trading_log.csv"
+TRADE_LOG_FIELDS = ["timestamp", "action", "rsi", "btc_qty", "btc_value", "btc_price", "account_value"]
+
+# Fall back to CoinGecko polling if the trade stream has been silent this long
+STREAM_STALE_SECONDS = 10
+
+# Reuse a CoinGecko response for this long; minute bars only change once a minute
+GECKO_CACHE_TTL_SECONDS = 55
+
+# Use 1-minute interval for the last 30 closes (about 30 minutes)
+_GECKO_URL = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart?" + urlencode(
+    {'vs_currency': 'usd', 'days': '1', 'interval': 'minutely'}
+)
+
+# Shared keep-alive pool; requests' per-call PreparedRequest machinery isn't needed for one fixed GET
+_HTTP = urllib3.PoolManager(maxsize=4, headers={"User-Agent": "algotrader"})
+
+_gecko_cache = {}  # (symbol, n) -> (monotonic fetch time, closes)
+
+def fetch_btc_usd_closes(symbol=None, n=30):
+    """Fetch real historical BTC/USD closes from CoinGecko for RSI"""
+    cached = _gecko_cache.get((symbol, n))
+    if cached is not None and time.monotonic() - cached[0] < GECKO_CACHE_TTL_SECONDS:
+        return cached[1]
+    try:
+        resp = _HTTP.request("GET", _GECKO_URL, timeout=10)
+        if resp.status >= 400:
+            raise RuntimeError(f"HTTP {resp.status}")
+        # Only the last n of ~1440 points are used; slice before building the closes list
+        prices = fastjson.loads(resp.data)['prices'][-n:]
+        closes = [price[1] for price in prices]
+        if len(closes) < n:
+            closes = [closes[0]] * (n - len(closes)) + closes  # pad if needed
+        _gecko_cache[(symbol, n)] = (time.monotonic(), closes)
+        return closes
+    except Exception as e:
+        print(f"Error fetching BTC closes from CoinGecko: {e}")
+        return [0] * n
 
 def main():
     # Load environment variables from .env file
@@ -58,27 +100,28 @@ def main():
     # Determine trading and market data symbols
     trading_symbol = args.symbol  # e.g., 'BTC/USD'
     
-    # Helper to fetch real historical BTC/USD closes from CoinGecko for RSI
-    def fetch_btc_usd_closes(symbol=None, n=30):
-        try:
-            # Use 1-minute interval for the last 30 closes (about 30 minutes)
-            url = 'https://api.coingecko.com/api/v3/coins/bitcoin/market_chart'
-            params = {'vs_currency': 'usd', 'days': '1', 'interval': 'minutely'}
-            resp = requests.get(url, params=params, timeout=10)
-            resp.raise_for_status()
-            prices = resp.json()['prices']
-            closes = [price[1] for price in prices][-n:]
-            if len(closes) < n:
-                closes = [closes[0]] * (n - len(closes)) + closes  # pad if needed
-            return closes
-        except Exception as e:
-            print(f"Error fetching BTC closes from CoinGecko: {e}")
-            return [0] * n
+    # Stream trades over a WebSocket into an in-memory buffer of one-minute closes.
+    # CoinGecko only seeds the buffer and serves as a fallback while the stream is down.
+    price_feed = CoinbaseTradeStream(product_id=trading_symbol.replace("/", "-"), maxlen=30)
+    seed_closes = fetch_btc_usd_closes(trading_symbol)
+    if seed_closes[-1] != 0:
+        price_feed.seed(seed_closes)
+    price_feed.start()
+
+    # Account and positions are pushed over Alpaca's trade updates stream and
+    # only re-read over REST after fills or once a minute
+    account_stream = AlpacaTradeUpdatesStream(trading_client, reconcile_interval=60.0)
+    account_stream.start()
+
+    def get_btc_usd_closes(symbol=None, n=30):
+        if price_feed.is_fresh(STREAM_STALE_SECONDS):
+            return price_feed.closes(n=n)
+        return fetch_btc_usd_closes(symbol, n)
 
     # Initialize RSI strategy
     strategy = RSIStrategy(
         trading_client=trading_client,
-        fetch_closes_func=fetch_btc_usd_closes,
+        fetch_closes_func=get_btc_usd_closes,
         symbol=trading_symbol,
         rsi_period=14,
         overbought=69,
@@ -86,34 +129,55 @@ def main():
     )
 
     print(f"\nStarting Bitcoin trading bot for {trading_symbol}")
-    print(f"Trading interval: 2 seconds")
+    print(f"Trading interval: on each {price_feed.product_id} trade, at most every {args.interval} second(s)")
     print(f"Position size: 10.0% of available cash")
     print(f"{'PAPER' if paper_trading else 'LIVE'} TRADING MODE")
     print("\nPress Ctrl+C to stop the trading bot...\n")
 
-    trade_log = []
+    # Append one row per check so the log survives crashes and memory stays flat
+    log_is_new = not os.path.exists(TRADE_LOG_PATH) or os.path.getsize(TRADE_LOG_PATH) == 0
+    trade_log_file = open(TRADE_LOG_PATH, "a", newline="")
+    trade_log = csv.DictWriter(trade_log_file, fieldnames=TRADE_LOG_FIELDS)
+    if log_is_new:
+        trade_log.writeheader()
+    seen_seq = 0
+    next_deadline = time.monotonic()
 
     try:
         while True:
+            # Start checks on a fixed --interval grid so work time doesn't
+            # accumulate as drift; if we've fallen behind, restart the grid
+            # from now instead of bursting through the missed checks
+            delay = next_deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_deadline = time.monotonic()
+            next_deadline += args.interval
+
+            # Block until the stream pushes a new trade; on timeout the check
+            # runs anyway and reads prices through the CoinGecko fallback
+            seen_seq = price_feed.wait_for_update(seen_seq, timeout=STREAM_STALE_SECONDS)
+
             print(f"\n{'-' * 50}")
             now = datetime.now()
-            print(f"Running strategy check at {now.strftime('%Y-%m-%d %H:%M:%S')}")
+            # isoformat skips strftime's format-string parsing; format once and reuse
+            now_str = now.isoformat(sep=" ", timespec="seconds")
+            print(f"Running strategy check at {now_str}")
 
             # Fetch real BTC/USD price
-            btc_price = fetch_btc_usd_closes(trading_symbol)[-1]
+            btc_price = get_btc_usd_closes(trading_symbol)[-1]
             if btc_price == 0:
                 print("Could not fetch BTC price. Skipping this iteration.")
-                time.sleep(2)
                 continue
             print(f"Current BTC price: ${btc_price:.2f}")
 
-            # Fetch account and BTC position from Alpaca
-            account = trading_client.get_account()
+            # Account and BTC position from the locally cached trade updates state
+            account = account_stream.get_account()
             account_value = float(account['portfolio_value'])
-            positions = trading_client.get_positions()
-            btc_position = next((p for p in positions if p['symbol'] == trading_symbol), None)
+            btc_position = account_stream.get_positions_dict().get(trading_symbol)
             btc_qty = float(btc_position['qty']) if btc_position else 0.0
-            btc_value = float(btc_position['market_value']) if btc_position else 0.0
+            btc_value = btc_qty * btc_price
             btc_pct = btc_value / account_value if account_value > 0 else 0.0
 
             signal, rsi_value = strategy.run()
@@ -161,8 +225,8 @@ def main():
                 print("No trade action taken.")
 
             # Log the action
-            trade_log.append({
-                'timestamp': now,
+            trade_log.writerow({
+                'timestamp': now_str,
                 'action': action,
                 'rsi': rsi_value,
                 'btc_qty': btc_qty,
@@ -170,28 +234,24 @@ def main():
                 'btc_price': btc_price,
                 'account_value': account_value
             })
+            trade_log_file.flush()
 
             # Wait for next interval
-            next_check = now.strftime('%Y-%m-%d %H:%M:%S')
-            print(f"\nNext check at: {next_check}")
-            print(f"Waiting for 2 seconds...")
-            time.sleep(2)
+            next_check = now + timedelta(seconds=max(0.0, next_deadline - time.monotonic()))
+            print(f"\nNext check at: {next_check.isoformat(sep=' ', timespec='seconds')}")
+            print(f"Waiting for the next trade (at least {args.interval} seconds)...")
 
     except KeyboardInterrupt:
         print("\nTrading bot stopped by user")
     except Exception as e:
         print(f"\nError in trading loop: {str(e)}")
     finally:
+        price_feed.stop()
+        account_stream.stop()
+        trading_client.close()
+        trade_log_file.close()
         print("\nTrading bot shutdown complete")
-        # Save log to Excel
-        try:
-            df = pd.DataFrame(trade_log)
-            df.to_excel('btc_trading_log.xlsx', index=False)
-            print("Trade log saved to btc_trading_log.xlsx")
-        except ImportError:
-            print("openpyxl is required to save Excel files. Please install it with 'pip install openpyxl'.")
-        except Exception as e:
-            print(f"Error saving trade log: {e}")
+        print(f"Trade log saved to {TRADE_LOG_PATH}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,6 +4,7 @@ Example script demonstrating how to use the backtesting engine with the momentum
 
 import os
 import sys
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
@@ -13,9 +14,25 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.api.market_data import AlpacaMarketDataClient
 from src.backtest.engine import BacktestEngine
+from src.utils.jit import njit, prange
+
+def bars_to_arrays(bars):
+    """Extract timestamps and closes from a list of Alpaca bars
+    
+    Args:
+        bars: List of bar dictionaries as returned by the Market Data API
+        
+    Returns:
+        Dictionary with "timestamps" (datetime64[ns], UTC) and "closes" (float64) arrays
+    """
+    n = len(bars)
+    # Bar times are RFC-3339 in UTC; NumPy datetimes are timezone-naive
+    timestamps = np.array([bar["t"].rstrip("Z") for bar in bars], dtype="datetime64[ns]")
+    closes = np.fromiter((bar["c"] for bar in bars), dtype=np.float64, count=n)
+    return {"timestamps": timestamps, "closes": closes}
 
 def fetch_historical_data(api_key, api_secret, symbols, start_date, end_date):
-    """Fetch historical data from Alpaca and convert to pandas DataFrames
+    """Fetch historical data from Alpaca as NumPy arrays
     
     Args:
         api_key: Alpaca API key
@@ -25,75 +42,232 @@ def fetch_historical_data(api_key, api_secret, symbols, start_date, end_date):
         end_date: End date in YYYY-MM-DD format
         
     Returns:
-        Dictionary mapping symbols to DataFrames with historical data
+        Dictionary mapping symbols to dictionaries of "timestamps" and "closes" arrays
     """
-    client = AlpacaMarketDataClient(api_key, api_secret)
-    
     # Fetch data
-    bars_data = client.get_stock_bars(
-        symbols=symbols,
-        timeframe="1Day",
-        start=start_date,
-        end=end_date,
-        adjustment="all"  # Apply split and dividend adjustments
-    )
+    with AlpacaMarketDataClient(api_key, api_secret) as client:
+        bars_by_symbol = client.get_bars_batch(
+            symbols=symbols,
+            timeframe="1Day",
+            start=start_date,
+            end=end_date,
+            adjustment="all"  # Apply split and dividend adjustments
+        )
     
     data = {}
     for symbol in symbols:
-        if symbol not in bars_data.get("bars", {}):
+        if symbol not in bars_by_symbol:
             print(f"No data found for {symbol}")
             continue
-            
-        bars = bars_data["bars"][symbol]
+        data[symbol] = bars_to_arrays(bars_by_symbol[symbol])
+    
+    return data
+
+def to_dataframes(data):
+    """Wrap historical arrays in the DataFrames expected by BacktestEngine.run
+    
+    Args:
+        data: Dictionary mapping symbols to "timestamps" and "closes" arrays
         
-        # Convert to DataFrame
-        df = pd.DataFrame(bars)
-        df.rename(columns={"t": "timestamp", "o": "open", "h": "high", "l": "low", "c": "close", "v": "volume"}, inplace=True)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df.set_index("timestamp", inplace=True)
+    Returns:
+        Dictionary mapping symbols to DataFrames with a close column
+    """
+    return {
+        symbol: pd.DataFrame({"close": arrays["closes"]}, index=pd.DatetimeIndex(arrays["timestamps"], name="timestamp"))
+        for symbol, arrays in data.items()
+    }
+
+def momentum_series(closes, lookback_days=20):
+    """Momentum over the lookback window ending at each bar
+    
+    Args:
+        closes: Contiguous float64 array of closing prices
+        lookback_days: Number of bars in the momentum window
         
-        data[symbol] = df
+    Returns:
+        Array of fractional price changes, NaN where fewer than lookback_days bars are available
+    """
+    momentum = np.full(len(closes), np.nan)
+    if len(closes) >= lookback_days:
+        momentum[lookback_days - 1:] = closes[lookback_days - 1:] / closes[:len(closes) - lookback_days + 1] - 1.0
+    return momentum
+
+def momentum_strategy(momentum, have_position, momentum_threshold=0.05):
+    """Simple momentum strategy for backtesting a single symbol
     
-    return data
+    Args:
+        momentum: Momentum of the symbol as of the current date
+        have_position: Whether there is an open position in the symbol
+        momentum_threshold: Threshold for considering significant momentum
+        
+    Returns:
+        Signal dictionary, or None for no action
+    """
+    if momentum > momentum_threshold and not have_position:
+        # Strong positive momentum and no position -> buy
+        return {"action": "buy", "qty": 10}  # Buy 10 shares
+    elif momentum < -momentum_threshold and have_position:
+        # Strong negative momentum and have position -> sell
+        return {"action": "sell"}  # Sell all shares
+    return None
 
-def momentum_strategy(data, positions, current_date):
-    """Simple momentum strategy for backtesting
+def align_to_dates(data, lookback_days=20):
+    """Align closes and momentum of all symbols on the union of their timestamps
     
     Args:
-        data: Dictionary mapping symbols to DataFrames with historical data
-        positions: Current positions
-        current_date: Current date in the backtest
+        data: Dictionary mapping symbols to "timestamps" and "closes" arrays
+        lookback_days: Number of bars in the momentum window
         
     Returns:
-        Dictionary mapping symbols to signal dictionaries
+        Tuple of (timestamps, symbols, closes, momentum); closes and momentum are
+        (dates x symbols) matrices. Closes are NaN on dates where a symbol has no bar;
+        momentum is as of the symbol's last bar on or before each date.
     """
-    signals = {}
-    lookback_days = 20
-    momentum_threshold = 0.05
-    
-    for symbol, df in data.items():
-        # Get data up to current date
-        df_subset = df[:current_date]
-        if len(df_subset) < lookback_days:
-            continue
-            
-        # Get closing prices for the lookback period
-        closes = df_subset["close"].values[-lookback_days:]
+    symbols = list(data)
+    timestamps = np.unique(np.concatenate([arrays["timestamps"] for arrays in data.values()]))
+    closes = np.full((len(timestamps), len(symbols)), np.nan)
+    momentum = np.full((len(timestamps), len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        symbol_momentum = momentum_series(data[symbol]["closes"], lookback_days)
+        last_bar = np.searchsorted(data[symbol]["timestamps"], timestamps, side="right") - 1
+        has_bar = last_bar >= 0
+        momentum[has_bar, j] = symbol_momentum[last_bar[has_bar]]
+        closes[np.searchsorted(timestamps, data[symbol]["timestamps"]), j] = data[symbol]["closes"]
+    return timestamps, symbols, closes, momentum
+
+def make_strategy_func(data, lookback_days=20, momentum_threshold=0.05):
+    """Build the backtest strategy function for the momentum strategy
+    
+    Momentum is computed for every bar in one vectorized pass per symbol and
+    aligned into a (dates x symbols) matrix over the union of all timestamps,
+    so each backtest date costs one row lookup and no pandas work.
+    
+    Args:
+        data: Dictionary mapping symbols to "timestamps" and "closes" arrays
+        lookback_days: Number of bars in the momentum window
+        momentum_threshold: Threshold for considering significant momentum
         
-        # Calculate momentum
-        start_price = closes[0]
-        end_price = closes[-1]
-        momentum = (end_price - start_price) / start_price
+    Returns:
+        Function with the signature expected by BacktestEngine.run
+    """
+    timestamps, symbols, _, momentum = align_to_dates(data, lookback_days)
+    row_of_date = dict(zip(pd.DatetimeIndex(timestamps), range(len(timestamps))))
+    
+    def strategy_func(data, positions, current_date):
+        signals = {}
+        row = momentum[row_of_date[current_date]]
+        for j, symbol in enumerate(symbols):
+            signal = momentum_strategy(row[j], symbol in positions, momentum_threshold)
+            if signal is not None:
+                signals[symbol] = signal
+        return signals
+    
+    return strategy_func
+
+@njit(parallel=True, cache=True)
+def _run_backtest(closes, momentum, threshold, buy_qty, initial_capital, commission, slippage):
+    # Same rules as BacktestEngine.run with momentum_strategy, on (dates x symbols) matrices.
+    # Returns portfolio value per date and trade columns (date, symbol, side, qty, price, amount),
+    # where amount is the cost of a buy or the revenue of a sell.
+    n_dates, n_symbols = closes.shape
+    
+    # Raw signals don't depend on positions, so compute them for all symbols in parallel
+    raw = np.zeros((n_dates, n_symbols), dtype=np.int8)
+    for j in prange(n_symbols):
+        for i in range(n_dates):
+            if momentum[i, j] > threshold:
+                raw[i, j] = 1
+            elif momentum[i, j] < -threshold:
+                raw[i, j] = -1
+    
+    # Cash and positions evolve sequentially
+    qty = np.zeros(n_symbols)
+    capital = initial_capital
+    portfolio_values = np.empty(n_dates)
+    # Every trade needs a raw signal, so that count bounds the trade buffers
+    max_trades = np.count_nonzero(raw)
+    t_date = np.empty(max_trades, dtype=np.int64)
+    t_symbol = np.empty(max_trades, dtype=np.int64)
+    t_side = np.empty(max_trades, dtype=np.int8)
+    t_qty = np.empty(max_trades)
+    t_price = np.empty(max_trades)
+    t_amount = np.empty(max_trades)
+    n_trades = 0
+    for i in range(n_dates):
+        value = capital
+        for j in range(n_symbols):
+            if qty[j] > 0.0 and not np.isnan(closes[i, j]):
+                value += qty[j] * closes[i, j]
+        portfolio_values[i] = value
         
-        # Generate signal based on momentum
-        if momentum > momentum_threshold and symbol not in positions:
-            # Strong positive momentum and no position -> buy
-            signals[symbol] = {"action": "buy", "qty": 10}  # Buy 10 shares
-        elif momentum < -momentum_threshold and symbol in positions:
-            # Strong negative momentum and have position -> sell
-            signals[symbol] = {"action": "sell"}  # Sell all shares
-    
-    return signals
+        for j in range(n_symbols):
+            price = closes[i, j]
+            if np.isnan(price):
+                continue
+            if raw[i, j] == 1 and qty[j] == 0.0:
+                cost = buy_qty * price * (1 + slippage)
+                total_cost = cost + cost * commission
+                if total_cost <= capital:
+                    t_date[n_trades], t_symbol[n_trades], t_side[n_trades] = i, j, 1
+                    t_qty[n_trades], t_price[n_trades], t_amount[n_trades] = buy_qty, price, total_cost
+                    n_trades += 1
+                    qty[j] = buy_qty
+                    capital -= total_cost
+            elif raw[i, j] == -1 and qty[j] > 0.0:
+                revenue = qty[j] * price * (1 - slippage)
+                total_revenue = revenue - revenue * commission
+                t_date[n_trades], t_symbol[n_trades], t_side[n_trades] = i, j, -1
+                t_qty[n_trades], t_price[n_trades], t_amount[n_trades] = qty[j], price, total_revenue
+                n_trades += 1
+                qty[j] = 0.0
+                capital += total_revenue
+    
+    return (portfolio_values, t_date[:n_trades], t_symbol[:n_trades], t_side[:n_trades],
+            t_qty[:n_trades], t_price[:n_trades], t_amount[:n_trades])
+
+# Compile at import (or load the on-disk cache) so the first backtest doesn't pay the JIT cost
+_run_backtest(np.ones((2, 1)), np.zeros((2, 1)), 0.05, 10.0, 100000.0, 0.0, 0.0)
+
+def run_compiled_backtest(data, lookback_days=20, momentum_threshold=0.05,
+                          initial_capital=100000.0, commission=0.0, slippage=0.0):
+    """Run the momentum backtest entirely in the compiled driver
+    
+    Produces the same portfolio values and trades as BacktestEngine.run with
+    make_strategy_func, without a Python call per date; useful for parameter sweeps.
+    
+    Args:
+        data: Dictionary mapping symbols to "timestamps" and "closes" arrays
+        lookback_days: Number of bars in the momentum window
+        momentum_threshold: Threshold for considering significant momentum
+        initial_capital: Initial capital for the backtest
+        commission: Commission rate (percentage)
+        slippage: Slippage rate (percentage)
+        
+    Returns:
+        Tuple of (results, trades) DataFrames in the format of BacktestEngine.run
+        and BacktestEngine.get_trade_history
+    """
+    timestamps, symbols, closes, momentum = align_to_dates(data, lookback_days)
+    portfolio_values, t_date, t_symbol, t_side, t_qty, t_price, t_amount = _run_backtest(
+        closes, momentum, momentum_threshold, 10.0, initial_capital, commission, slippage
+    )
+    
+    dates = pd.DatetimeIndex(timestamps, name="date")
+    results = pd.DataFrame({"portfolio_value": portfolio_values}, index=dates)
+    results["daily_return"] = results["portfolio_value"].pct_change()
+    results["cumulative_return"] = (results["portfolio_value"] / initial_capital) - 1
+    
+    is_buy = t_side > 0
+    trades = pd.DataFrame({
+        "date": dates[t_date],
+        "symbol": np.asarray(symbols, dtype=object)[t_symbol],
+        "action": np.where(is_buy, "buy", "sell"),
+        "qty": t_qty,
+        "price": t_price,
+        "cost": np.where(is_buy, t_amount, np.nan),
+        "revenue": np.where(is_buy, np.nan, t_amount)
+    })
+    return results, trades
 
 def main():
     # Load environment variables
@@ -122,7 +296,7 @@ def main():
     
     # Run backtest
     print("Running backtest...")
-    results = engine.run(data, momentum_strategy)
+    results = engine.run(to_dataframes(data), make_strategy_func(data))
     
     # Calculate and print statistics
     stats = engine.get_stats(results)
@@ -139,6 +313,15 @@ def main():
     print("\nTrade History:")
     print(trades)
     
+    # Sweep the momentum threshold with the compiled driver
+    print("\nMomentum Threshold Sweep:")
+    for threshold in (0.02, 0.05, 0.10):
+        sweep_results, sweep_trades = run_compiled_backtest(
+            data, momentum_threshold=threshold, initial_capital=100000.0, commission=0.001, slippage=0.001
+        )
+        print(f"Threshold {threshold:.0%}: Total Return {sweep_results['cumulative_return'].iloc[-1]:.2%}, "
+              f"{len(sweep_trades)} trades")
+    
     # Plot results
     try:
         import matplotlib.pyplot as plt
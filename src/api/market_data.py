@@ -6,9 +6,21 @@ Uses the OpenAPI specification from /api/alpaca_market_data_openapi.json
 import os
 import requests
 import json
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional, Union, Any
 from datetime import datetime, date
 
+from ..utils import fastjson
+from ..utils.cache import ttl_cache
+from ..utils.retry import REQUEST_TIMEOUT, JitteredRetry
+
+# Server-side cap on the number of symbols in one multi-symbol request
+MAX_SYMBOLS_PER_REQUEST = 100
+
+def _chunks(items: List[str], size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
 class AlpacaMarketDataClient:
     """Client for the Alpaca Market Data API"""
     
@@ -27,6 +39,35 @@ class AlpacaMarketDataClient:
             "APCA-API-KEY-ID": self.api_key,
             "APCA-API-SECRET-KEY": self.api_secret
         }
+        
+        # Reuse keep-alive connections across calls and retry rate limits / transient errors
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=JitteredRetry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        self._session.mount("https://", adapter)
+        
+        # Short-lived cache of latest-quote reads
+        self._ttl_cache = {}
+    
+    def close(self) -> None:
+        """Close the underlying HTTP session"""
+        self._session.close()
+    
+    def __enter__(self) -> "AlpacaMarketDataClient":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
     
     def get_stock_bars(self, 
                     symbols: List[str], 
@@ -34,7 +75,8 @@ class AlpacaMarketDataClient:
                     start: Optional[str] = None,
                     end: Optional[str] = None,
                     limit: int = 1000,
-                    adjustment: str = "raw") -> Dict[str, Any]:
+                    adjustment: str = "raw",
+                    page_token: Optional[str] = None) -> Dict[str, Any]:
         """Get historical stock bars
         
         Args:
@@ -44,6 +86,7 @@ class AlpacaMarketDataClient:
             end: End date/time in RFC-3339 format
             limit: Maximum number of bars to return
             adjustment: Adjustment type (raw, split, dividend, all)
+            page_token: Pagination token from a previous response
             
         Returns:
             Dictionary containing bar data for each symbol
@@ -60,10 +103,48 @@ class AlpacaMarketDataClient:
             params["start"] = start
         if end is not None:
             params["end"] = end
+        if page_token is not None:
+            params["page_token"] = page_token
             
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
+    
+    def get_bars_batch(self,
+                    symbols: List[str],
+                    timeframe: str = "1Day",
+                    start: Optional[str] = None,
+                    end: Optional[str] = None,
+                    limit: int = 1000,
+                    adjustment: str = "raw") -> Dict[str, List[Dict[str, Any]]]:
+        """Get historical stock bars for any number of symbols
+        
+        Symbols are requested in chunks of MAX_SYMBOLS_PER_REQUEST and every
+        page of each chunk is followed, so one call replaces a per-symbol loop.
+        
+        Args:
+            symbols: List of symbols
+            timeframe: Time frame for the bars (e.g., 1Min, 5Min, 15Min, 1Hour, 1Day)
+            start: Start date/time in RFC-3339 format
+            end: End date/time in RFC-3339 format
+            limit: Maximum number of bars to return per page
+            adjustment: Adjustment type (raw, split, dividend, all)
+            
+        Returns:
+            Dictionary mapping each symbol with data to its list of bars
+        """
+        bars = {}
+        for chunk in _chunks(symbols, MAX_SYMBOLS_PER_REQUEST):
+            page_token = None
+            while True:
+                bars_data = self.get_stock_bars(chunk, timeframe=timeframe, start=start, end=end,
+                                                limit=limit, adjustment=adjustment, page_token=page_token)
+                for symbol, symbol_bars in (bars_data.get("bars") or {}).items():
+                    bars.setdefault(symbol, []).extend(symbol_bars)
+                page_token = bars_data.get("next_page_token")
+                if not page_token:
+                    break
+        return bars
     
     def get_stock_latest_trade(self, symbols: List[str]) -> Dict[str, Any]:
         """Get latest trade for each symbol
@@ -79,9 +160,23 @@ class AlpacaMarketDataClient:
             "symbols": ",".join(symbols)
         }
         
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
+    
+    def get_latest_trades_batch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get latest trade for any number of symbols
+        
+        Args:
+            symbols: List of symbols
+            
+        Returns:
+            Dictionary mapping each symbol with data to its latest trade
+        """
+        trades = {}
+        for chunk in _chunks(symbols, MAX_SYMBOLS_PER_REQUEST):
+            trades.update(self.get_stock_latest_trade(chunk).get("trades") or {})
+        return trades
     
     def get_stock_latest_quote(self, symbols: List[str]) -> Dict[str, Any]:
         """Get latest quote for each symbol
@@ -97,9 +192,9 @@ class AlpacaMarketDataClient:
             "symbols": ",".join(symbols)
         }
         
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
     
     def get_news(self, 
               symbols: Optional[List[str]] = None,
@@ -132,9 +227,9 @@ class AlpacaMarketDataClient:
         if end is not None:
             params["end"] = end
             
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
     
     def get_market_movers(self, market_type: str = "stocks") -> Dict[str, Any]:
         """Get market movers (gainers and losers)
@@ -147,9 +242,9 @@ class AlpacaMarketDataClient:
         """
         url = f"{self.base_url}/v1beta1/screener/{market_type}/movers"
         
-        response = requests.get(url, headers=self.headers)
+        response = self._session.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
     
     def get_most_actives(self, market_type: str = "stocks") -> Dict[str, Any]:
         """Get most active symbols
@@ -162,26 +257,44 @@ class AlpacaMarketDataClient:
         """
         url = f"{self.base_url}/v1beta1/screener/{market_type}/movers/most_actives"
         
-        response = requests.get(url, headers=self.headers)
+        response = self._session.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
 
+    @ttl_cache(2.0)
     def get_crypto_latest_quote(self, symbols: List[str]) -> Dict[str, Any]:
         """Get latest crypto quote for each symbol"""
         url = f"{self.base_url}/v1beta1/crypto/quotes/latest"
         params = {"symbols": ",".join(symbols)}
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
 
-    def get_crypto_bars(self, symbols: List[str], timeframe: str = "1Hour", limit: int = 500) -> Dict[str, Any]:
-        """Get crypto bars for each symbol"""
+    def get_crypto_bars(self,
+                        symbols: List[str],
+                        timeframe: str = "1Hour",
+                        limit: int = 500,
+                        start: Optional[str] = None) -> Dict[str, Any]:
+        """Get crypto bars for each symbol
+        
+        Args:
+            symbols: List of crypto symbols
+            timeframe: Time frame for the bars (e.g., 1Min, 1Hour, 1Day)
+            limit: Maximum number of bars to return
+            start: Only return bars at or after this RFC-3339 time
+            
+        Returns:
+            Dictionary containing bar data for each symbol
+        """
         url = f"{self.base_url}/v1beta1/crypto/bars"
         params = {
             "symbols": ",".join(symbols),
             "timeframe": timeframe,
             "limit": limit
         }
-        response = requests.get(url, headers=self.headers, params=params)
+        
+        if start is not None:
+            params["start"] = start
+        response = self._session.get(url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
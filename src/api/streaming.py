@@ -0,0 +1,305 @@
+"""
+Real-time streams.
+Updates are pushed over persistent WebSockets and kept in memory so that
+strategies can read the latest state without a network round-trip.
+"""
+
+import json
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from websockets.sync.client import connect
+
+from ..utils import fastjson
+from .trading import AlpacaTradingClient
+
+
+class _WebSocketStream(ABC):
+    """Background WebSocket reader that reconnects with exponential backoff"""
+
+    def __init__(self, url: str, name: str, reconnect_delay: float = 1.0):
+        self.url = url
+        self.name = name
+        self.reconnect_delay = reconnect_delay
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start receiving messages on a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread"""
+        self._stop.set()
+
+    @abstractmethod
+    def _subscribe(self, ws) -> None:
+        """Send authentication/subscription messages on a new connection"""
+        pass
+
+    @abstractmethod
+    def _on_message(self, msg: Dict[str, Any]) -> None:
+        """Handle one decoded message"""
+        pass
+
+    def _run(self) -> None:
+        delay = self.reconnect_delay
+
+        while not self._stop.is_set():
+            try:
+                with connect(self.url) as ws:
+                    self._subscribe(ws)
+                    delay = self.reconnect_delay
+                    # Blocking receive: the thread only wakes when the server pushes data
+                    for message in ws:
+                        if self._stop.is_set():
+                            return
+                        self._on_message(fastjson.loads(message))
+            except Exception as e:
+                print(f"{self.name} stream error: {e}")
+
+            self._stop.wait(delay)
+            delay = min(delay * 2, 30.0)
+
+
+class CoinbaseTradeStream(_WebSocketStream):
+    """Coinbase Exchange trade feed aggregated into one-minute closes"""
+
+    def __init__(self,
+                 product_id: str = "BTC-USD",
+                 maxlen: int = 30,
+                 url: str = "wss://ws-feed.exchange.coinbase.com",
+                 reconnect_delay: float = 1.0):
+        """Initialize the trade stream
+
+        Args:
+            product_id: Coinbase product to subscribe to (e.g., BTC-USD)
+            maxlen: Number of one-minute closes to keep in the ring buffer
+            url: WebSocket feed URL
+            reconnect_delay: Initial delay in seconds before reconnecting after an error
+        """
+        super().__init__(url, f"{product_id} trades", reconnect_delay)
+        self.product_id = product_id
+        self._bars: deque = deque(maxlen=maxlen)  # (minute timestamp, close)
+        self._seq = 0
+        self._last_update = 0.0
+        self._cond = threading.Condition(threading.Lock())
+
+    def stop(self) -> None:
+        """Stop the background thread and release any waiters"""
+        super().stop()
+        with self._cond:
+            self._cond.notify_all()
+
+    def seed(self, closes: List[float]) -> None:
+        """Pre-fill the buffer with historical one-minute closes
+
+        Args:
+            closes: Closes ordered oldest to newest, the last one being the previous minute
+        """
+        minute = int(time.time()) // 60 * 60
+        closes = closes[-self._bars.maxlen:]
+        with self._cond:
+            if self._bars:
+                return
+            for i, close in enumerate(closes):
+                self._bars.append((minute - 60 * (len(closes) - i), float(close)))
+
+    def closes(self, symbol: Optional[str] = None, n: Optional[int] = None) -> List[float]:
+        """Get the buffered one-minute closes
+
+        Args:
+            symbol: Ignored, accepted so this can be used as a closes fetcher
+            n: Maximum number of closes to return (default: all buffered)
+
+        Returns:
+            List of closes ordered oldest to newest
+        """
+        with self._cond:
+            closes = [price for _, price in self._bars]
+        return closes[-n:] if n else closes
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Whether a trade has been received in the last max_age seconds"""
+        return time.monotonic() - self._last_update < max_age
+
+    def wait_for_update(self, seq: int, timeout: Optional[float] = None) -> int:
+        """Block until a trade newer than seq arrives
+
+        Args:
+            seq: Sequence number returned by the previous call (0 initially)
+            timeout: Maximum time to wait in seconds (default: wait forever)
+
+        Returns:
+            Latest sequence number, equal to seq if the wait timed out
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != seq or self._stop.is_set(), timeout)
+            return self._seq
+
+    def _on_trade(self, ts: float, price: float) -> None:
+        minute = int(ts) // 60 * 60
+        with self._cond:
+            if self._bars and self._bars[-1][0] >= minute:
+                self._bars[-1] = (self._bars[-1][0], price)
+            else:
+                self._bars.append((minute, price))
+            self._seq += 1
+            self._last_update = time.monotonic()
+            self._cond.notify_all()
+
+    def _subscribe(self, ws) -> None:
+        ws.send(json.dumps({
+            "type": "subscribe",
+            "product_ids": [self.product_id],
+            "channels": ["matches"]
+        }))
+
+    def _on_message(self, msg: Dict[str, Any]) -> None:
+        if msg.get("type") in ("match", "last_match"):
+            self._on_trade(_parse_time(msg.get("time")), float(msg["price"]))
+
+
+class AlpacaTradeUpdatesStream(_WebSocketStream):
+    """Alpaca trade_updates stream keeping account and positions cached locally
+
+    Fills update the cached position quantities as they are pushed. The
+    account and positions are re-read over REST after a fill changes cash,
+    after a reconnect (events may have been missed), and otherwise once per
+    reconcile interval.
+    """
+
+    def __init__(self,
+                 trading_client: AlpacaTradingClient,
+                 reconcile_interval: float = 60.0,
+                 reconnect_delay: float = 1.0):
+        """Initialize the trade updates stream
+
+        Args:
+            trading_client: Alpaca Trading API client used for authentication and REST reconciles
+            reconcile_interval: Maximum age in seconds of the cached state before it is re-read over REST
+            reconnect_delay: Initial delay in seconds before reconnecting after an error
+        """
+        super().__init__(trading_client.base_url.replace("https://", "wss://") + "/stream",
+                         "Alpaca trade updates", reconnect_delay)
+        self.trading_client = trading_client
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.Lock()
+        self._account_cache: Dict[str, Any] = {}
+        self._positions_cache: Dict[str, Dict[str, Any]] = {}
+        self._reconciled_at = 0.0
+        self._stale = True
+        # Bumped for every fill so a reconcile can tell whether one raced its REST reads
+        self._events = 0
+
+    def start(self) -> None:
+        """Load the current state over REST and start listening for updates"""
+        self.reconcile()
+        super().start()
+
+    def reconcile(self) -> None:
+        """Re-read the account and positions over REST
+        
+        If a fill arrives while the REST reads are in flight, they may predate
+        it; the pushed state is kept and the cache stays stale for the next read.
+        """
+        with self._lock:
+            events = self._events
+        self.trading_client.invalidate()
+        account = self.trading_client.get_account()
+        positions = {p["symbol"]: dict(p) for p in self.trading_client.get_positions()}
+        with self._lock:
+            if self._events != events:
+                self._stale = True
+                return
+            self._account_cache = account
+            self._positions_cache = positions
+            self._reconciled_at = time.monotonic()
+            self._stale = False
+
+    def get_account(self) -> Dict[str, Any]:
+        """Get the cached account information
+
+        Returns:
+            Account information
+        """
+        self._reconcile_if_needed()
+        with self._lock:
+            return dict(self._account_cache)
+
+    def get_positions(self) -> List[Dict[str, Any]]:
+        """Get the cached open positions
+
+        Returns:
+            List of positions
+        """
+        self._reconcile_if_needed()
+        with self._lock:
+            return [dict(p) for p in self._positions_cache.values()]
+
+    def get_positions_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Get the cached open positions keyed by symbol
+
+        Returns:
+            Dictionary mapping symbols to positions
+        """
+        self._reconcile_if_needed()
+        with self._lock:
+            return {symbol: dict(p) for symbol, p in self._positions_cache.items()}
+
+    def _reconcile_if_needed(self) -> None:
+        with self._lock:
+            needed = self._stale or time.monotonic() - self._reconciled_at >= self.reconcile_interval
+        if needed:
+            self.reconcile()
+
+    def _subscribe(self, ws) -> None:
+        ws.send(json.dumps({
+            "action": "auth",
+            "key": self.trading_client.api_key,
+            "secret": self.trading_client.api_secret
+        }))
+        reply = fastjson.loads(ws.recv())
+        if reply.get("data", {}).get("status") != "authorized":
+            raise ValueError(f"Authentication failed: {reply}")
+        ws.send(json.dumps({"action": "listen", "data": {"streams": ["trade_updates"]}}))
+        # Anything may have happened while disconnected
+        with self._lock:
+            self._stale = True
+
+    def _on_message(self, msg: Dict[str, Any]) -> None:
+        if msg.get("stream") != "trade_updates":
+            return
+        data = msg.get("data", {})
+        if data.get("event") not in ("fill", "partial_fill"):
+            return
+
+        symbol = data["order"]["symbol"]
+        position_qty = data.get("position_qty")
+        with self._lock:
+            self._events += 1
+            if position_qty is not None:
+                if float(position_qty) == 0.0:
+                    self._positions_cache.pop(symbol, None)
+                else:
+                    position = self._positions_cache.setdefault(symbol, {"symbol": symbol})
+                    position["qty"] = position_qty
+            # Cash and market values moved; re-read them on next access
+            self._stale = True
+
+
+def _parse_time(value: Optional[str]) -> float:
+    if not value:
+        return time.time()
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return time.time()
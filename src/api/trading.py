@@ -5,9 +5,51 @@ Uses the OpenAPI specification from /api/alpaca_openapi.json
 
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
 import json
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional, Union, Any
 
+from ..utils import fastjson
+from ..utils.cache import ttl_cache
+from ..utils.retry import REQUEST_TIMEOUT, JitteredRetry
+
+@dataclass(frozen=True, slots=True)
+class OrderRequest:
+    """Parameters of a new order, as accepted by AlpacaTradingClient.submit_order"""
+    symbol: str
+    qty: Optional[str] = None
+    notional: Optional[str] = None
+    side: str = "buy"
+    type: str = "market"
+    time_in_force: str = "day"
+    limit_price: Optional[str] = None
+    stop_price: Optional[str] = None
+    extended_hours: bool = False
+    client_order_id: Optional[str] = None
+    order_class: Optional[str] = None
+    take_profit: Optional[Dict[str, Any]] = None
+    stop_loss: Optional[Dict[str, Any]] = None
+    
+    def __post_init__(self):
+        if self.qty is None and self.notional is None:
+            raise ValueError("Either qty or notional must be provided")
+
+_ORDER_FIELDS = tuple(field.name for field in fields(OrderRequest))
+
+def _to_payload(order: OrderRequest) -> bytes:
+    """Serialize an order request, leaving out unset fields"""
+    payload = {}
+    for name in _ORDER_FIELDS:
+        value = getattr(order, name)
+        if value is not None:
+            payload[name] = value
+    # qty takes precedence when both are given
+    if order.qty is not None:
+        payload.pop("notional", None)
+    return fastjson.dumps(payload)
+
 class AlpacaTradingClient:
     """Client for the Alpaca Trading API"""
     
@@ -27,29 +69,74 @@ class AlpacaTradingClient:
             "APCA-API-SECRET-KEY": self.api_secret,
             "Content-Type": "application/json"
         }
+        self._account_url = f"{self.base_url}/v2/account"
+        self._positions_url = f"{self.base_url}/v2/positions"
+        self._orders_url = f"{self.base_url}/v2/orders"
+        
+        # Reuse keep-alive connections across calls and retry rate limits / transient errors
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=JitteredRetry(
+                total=5,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        self._session.mount("https://", adapter)
+        
+        # Short-lived cache of account/positions/orders reads, cleared whenever an order changes state
+        self._ttl_cache = {}
+    
+    def invalidate(self) -> None:
+        """Drop cached account, positions and orders responses"""
+        self._ttl_cache.clear()
     
+    def close(self) -> None:
+        """Close the underlying HTTP session"""
+        self._session.close()
+    
+    def __enter__(self) -> "AlpacaTradingClient":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    @ttl_cache(30.0)
     def get_account(self) -> Dict[str, Any]:
         """Get account information
         
         Returns:
             Account information
         """
-        url = f"{self.base_url}/v2/account"
-        response = requests.get(url, headers=self.headers)
+        response = self._session.get(self._account_url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
     
+    @ttl_cache(10.0)
     def get_positions(self) -> List[Dict[str, Any]]:
         """Get all open positions
         
         Returns:
             List of positions
         """
-        url = f"{self.base_url}/v2/positions"
-        response = requests.get(url, headers=self.headers)
+        response = self._session.get(self._positions_url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
+    
+    def get_positions_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Get all open positions keyed by symbol
+        
+        Returns:
+            Dictionary mapping symbols to positions
+        """
+        return {p["symbol"]: p for p in self.get_positions()}
     
+    @ttl_cache(10.0)
     def get_orders(self, status: str = "open", limit: int = 50) -> List[Dict[str, Any]]:
         """Get orders
         
@@ -60,14 +147,13 @@ class AlpacaTradingClient:
         Returns:
             List of orders
         """
-        url = f"{self.base_url}/v2/orders"
         params = {
             "status": status,
             "limit": limit
         }
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._session.get(self._orders_url, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
     
     def submit_order(self, 
                    symbol: str, 
@@ -103,42 +189,67 @@ class AlpacaTradingClient:
         Returns:
             Order information
         """
-        url = f"{self.base_url}/v2/orders"
-        
-        # Build order data
-        order_data = {
-            "symbol": symbol,
-            "side": side,
-            "type": type,
-            "time_in_force": time_in_force,
-            "extended_hours": extended_hours
-        }
-        
-        # Add quantity or notional
-        if qty is not None:
-            order_data["qty"] = qty
-        elif notional is not None:
-            order_data["notional"] = notional
-        else:
-            raise ValueError("Either qty or notional must be provided")
+        return self.submit_order_request(OrderRequest(
+            symbol=symbol,
+            qty=qty,
+            notional=notional,
+            side=side,
+            type=type,
+            time_in_force=time_in_force,
+            limit_price=limit_price,
+            stop_price=stop_price,
+            extended_hours=extended_hours,
+            client_order_id=client_order_id,
+            order_class=order_class,
+            take_profit=take_profit,
+            stop_loss=stop_loss
+        ))
+    
+    def submit_order_request(self, order: OrderRequest) -> Dict[str, Any]:
+        """Submit a new order from a prebuilt request
         
-        # Add optional parameters
-        if limit_price is not None:
-            order_data["limit_price"] = limit_price
-        if stop_price is not None:
-            order_data["stop_price"] = stop_price
-        if client_order_id is not None:
-            order_data["client_order_id"] = client_order_id
-        if order_class is not None:
-            order_data["order_class"] = order_class
-        if take_profit is not None:
-            order_data["take_profit"] = take_profit
-        if stop_loss is not None:
-            order_data["stop_loss"] = stop_loss
+        Args:
+            order: Order parameters
             
-        response = requests.post(url, headers=self.headers, json=order_data)
+        Returns:
+            Order information
+        """
+        response = self._session.post(self._orders_url, data=_to_payload(order), timeout=REQUEST_TIMEOUT)
+        self.invalidate()
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
+    
+    def submit_orders(self,
+                    orders: List[Dict[str, Any]],
+                    max_workers: int = 8,
+                    return_exceptions: bool = False) -> List[Any]:
+        """Submit several orders concurrently
+        
+        Orders go out in parallel over the pooled session, so N orders take
+        about one round-trip instead of N.
+        
+        Args:
+            orders: Keyword arguments for submit_order, one dictionary per order
+            max_workers: Maximum number of orders in flight at once
+            return_exceptions: If true, a failed order's exception is returned in its
+                place instead of being raised
+            
+        Returns:
+            Order information for each order, in the same order as the input
+        """
+        if not orders:
+            return []
+        
+        def submit(order):
+            try:
+                return self.submit_order(**order)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(orders))) as executor:
+            return list(executor.map(submit, orders))
     
     def cancel_order(self, order_id: str) -> None:
         """Cancel an order
@@ -146,8 +257,8 @@ class AlpacaTradingClient:
         Args:
             order_id: ID of the order to cancel
         """
-        url = f"{self.base_url}/v2/orders/{order_id}"
-        response = requests.delete(url, headers=self.headers)
+        response = self._session.delete(f"{self._orders_url}/{order_id}", timeout=REQUEST_TIMEOUT)
+        self.invalidate()
         response.raise_for_status()
         
     def cancel_all_orders(self) -> List[Dict[str, Any]]:
@@ -156,7 +267,7 @@ class AlpacaTradingClient:
         Returns:
             List of canceled orders
         """
-        url = f"{self.base_url}/v2/orders"
-        response = requests.delete(url, headers=self.headers)
+        response = self._session.delete(self._orders_url, timeout=REQUEST_TIMEOUT)
+        self.invalidate()
         response.raise_for_status()
-        return response.json()
+        return fastjson.loads(response.content)
@@ -4,8 +4,104 @@ Backtesting engine for testing trading strategies
 
 import pandas as pd
 import numpy as np
+from array import array
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any, Callable
+from functools import reduce
+from typing import Dict, List, Optional, Union, Any, Callable, Tuple
+
+from ..utils.jit import njit
+
+TRADE_COLUMNS = ("date", "symbol", "action", "qty", "price", "cost", "revenue")
+# Stored unboxed as contiguous doubles rather than as lists of float objects
+FLOAT_TRADE_COLUMNS = ("price", "cost", "revenue")
+
+# Signal codes for BacktestEngine.run_signals
+HOLD = 0
+BUY = 1
+SELL = 2
+
+@njit(cache=True)
+def _simulate(prices, actions, quantities, capital, commission, slippage, held, qty, avg_price, cost, max_trades):
+    # Same rules as BacktestEngine.run on (dates x symbols) matrices, applying a date's
+    # signals in column order. held/qty/avg_price/cost are updated in place.
+    n_days, n_symbols = prices.shape
+    pv = np.empty(n_days)
+    t_day = np.empty(max_trades, dtype=np.int64)
+    t_symbol = np.empty(max_trades, dtype=np.int64)
+    t_action = np.empty(max_trades, dtype=np.int8)
+    t_qty = np.empty(max_trades)
+    t_price = np.empty(max_trades)
+    t_amount = np.empty(max_trades)
+    n_trades = 0
+    
+    for i in range(n_days):
+        value = capital
+        for j in range(n_symbols):
+            if qty[j] != 0.0 and not np.isnan(prices[i, j]):
+                value += qty[j] * prices[i, j]
+        pv[i] = value
+        
+        for j in range(n_symbols):
+            action = actions[i, j]
+            price = prices[i, j]
+            if action == HOLD or np.isnan(price):
+                continue
+            
+            if action == BUY:
+                buy_qty = 1.0 if np.isnan(quantities[i, j]) else quantities[i, j]
+                trade_cost = buy_qty * price * (1 + slippage)
+                commission_cost = trade_cost * commission
+                total_cost = trade_cost + commission_cost
+                
+                if total_cost <= capital:
+                    t_day[n_trades] = i
+                    t_symbol[n_trades] = j
+                    t_action[n_trades] = BUY
+                    t_qty[n_trades] = buy_qty
+                    t_price[n_trades] = price
+                    t_amount[n_trades] = total_cost
+                    n_trades += 1
+                    
+                    if held[j]:
+                        qty[j] += buy_qty
+                        cost[j] += total_cost
+                        avg_price[j] = cost[j] / qty[j]
+                    else:
+                        held[j] = True
+                        qty[j] = buy_qty
+                        avg_price[j] = price
+                        cost[j] = total_cost
+                    
+                    capital -= total_cost
+            
+            elif action == SELL and held[j]:
+                max_qty = qty[j]
+                sell_qty = max_qty if np.isnan(quantities[i, j]) else min(quantities[i, j], max_qty)
+                revenue = sell_qty * price * (1 - slippage)
+                commission_cost = revenue * commission
+                total_revenue = revenue - commission_cost
+                
+                t_day[n_trades] = i
+                t_symbol[n_trades] = j
+                t_action[n_trades] = SELL
+                t_qty[n_trades] = sell_qty
+                t_price[n_trades] = price
+                t_amount[n_trades] = total_revenue
+                n_trades += 1
+                
+                if sell_qty == max_qty:
+                    held[j] = False
+                    qty[j] = 0.0
+                    avg_price[j] = 0.0
+                    cost[j] = 0.0
+                else:
+                    qty[j] -= sell_qty
+                    cost[j] *= 1.0 - sell_qty / max_qty
+                
+                capital += total_revenue
+    
+    return (capital, pv, t_day[:n_trades], t_symbol[:n_trades], t_action[:n_trades],
+            t_qty[:n_trades], t_price[:n_trades], t_amount[:n_trades])
 
 class BacktestEngine:
     """Engine for backtesting trading strategies"""
@@ -26,8 +122,11 @@ class BacktestEngine:
         self.slippage = slippage
         self.capital = initial_capital
         self.positions = {}
-        self.trades = []
-        self.portfolio_history = []
+        # Columnar buffers: one list/array per field instead of a dict per row
+        self.trades = {column: array("d") if column in FLOAT_TRADE_COLUMNS else []
+                       for column in TRADE_COLUMNS}
+        self.portfolio_history = {"date": np.empty(0, dtype="datetime64[ns]"),
+                                  "portfolio_value": np.empty(0, dtype=np.float64)}
     
     def run(self, 
           data: Dict[str, pd.DataFrame],
@@ -47,133 +146,208 @@ class BacktestEngine:
         Returns:
             DataFrame with backtest results
         """
-        # Get sorted list of all dates in the data
-        all_dates = set()
-        for symbol, df in data.items():
-            all_dates.update(df.index)
-        dates = sorted(list(all_dates))
+        dates, symbols, prices = self.align_prices(data)
+        col_of = {symbol: j for j, symbol in enumerate(symbols)}
+        marks = np.nan_to_num(prices)
+        
+        # Positions are tracked in arrays indexed by column; self.positions mirrors
+        # them for the strategy and is rewritten only for symbols that trade
+        held, qty, avg_price, cost = self._load_positions(symbols)
+        pv = np.empty(len(dates), dtype=np.float64)
         
         # Run the backtest for each date
-        for date in dates:
-            # Get current prices for all symbols
-            current_prices = {}
-            for symbol, df in data.items():
-                if date in df.index:
-                    current_prices[symbol] = df.loc[date, "close"]
-            
-            # Update portfolio value
-            portfolio_value = self.capital
-            for symbol, position in self.positions.items():
-                if symbol in current_prices:
-                    portfolio_value += position["qty"] * current_prices[symbol]
-            
-            # Record portfolio history
-            self.portfolio_history.append({
-                "date": date,
-                "portfolio_value": portfolio_value
-            })
+        for i, date in enumerate(dates):
+            # Mark the portfolio to market; missing prices are zeroed in marks
+            pv[i] = self.capital + np.dot(qty, marks[i])
             
             # Generate signals
             signals = strategy_func(data, self.positions, date)
             
             # Execute signals
+            row = prices[i]
             for symbol, signal in signals.items():
-                if symbol not in current_prices:
+                j = col_of.get(symbol)
+                if j is None or np.isnan(row[j]):
                     continue
                     
-                price = current_prices[symbol]
+                price = row[j]
                 
                 if signal["action"] == "buy":
                     # Calculate number of shares to buy
-                    qty = signal.get("qty", 1)
-                    cost = qty * price * (1 + self.slippage)
-                    commission_cost = cost * self.commission
-                    total_cost = cost + commission_cost
+                    buy_qty = signal.get("qty", 1)
+                    trade_cost = buy_qty * price * (1 + self.slippage)
+                    commission_cost = trade_cost * self.commission
+                    total_cost = trade_cost + commission_cost
                     
                     if total_cost <= self.capital:
                         # Record the trade
-                        self.trades.append({
-                            "date": date,
-                            "symbol": symbol,
-                            "action": "buy",
-                            "qty": qty,
-                            "price": price,
-                            "cost": total_cost
-                        })
+                        self._record_trade(date, symbol, "buy", buy_qty, price, cost=total_cost)
                         
                         # Update positions and capital
-                        if symbol in self.positions:
+                        if held[j]:
                             # Average down
-                            total_qty = self.positions[symbol]["qty"] + qty
-                            total_cost = self.positions[symbol]["cost"] + total_cost
-                            avg_price = total_cost / total_qty
-                            self.positions[symbol] = {
-                                "qty": total_qty,
-                                "avg_price": avg_price,
-                                "cost": total_cost
-                            }
+                            qty[j] += buy_qty
+                            cost[j] += total_cost
+                            avg_price[j] = cost[j] / qty[j]
                         else:
                             # New position
-                            self.positions[symbol] = {
-                                "qty": qty,
-                                "avg_price": price,
-                                "cost": total_cost
-                            }
+                            held[j] = True
+                            qty[j] = buy_qty
+                            avg_price[j] = price
+                            cost[j] = total_cost
                         
+                        self.positions[symbol] = {"qty": qty[j], "avg_price": avg_price[j], "cost": cost[j]}
                         self.capital -= total_cost
                     
-                elif signal["action"] == "sell" and symbol in self.positions:
+                elif signal["action"] == "sell" and held[j]:
                     # Calculate number of shares to sell
-                    max_qty = self.positions[symbol]["qty"]
-                    qty = min(signal.get("qty", max_qty), max_qty)
-                    revenue = qty * price * (1 - self.slippage)
+                    max_qty = qty[j]
+                    sell_qty = min(signal.get("qty", max_qty), max_qty)
+                    revenue = sell_qty * price * (1 - self.slippage)
                     commission_cost = revenue * self.commission
                     total_revenue = revenue - commission_cost
                     
                     # Record the trade
-                    self.trades.append({
-                        "date": date,
-                        "symbol": symbol,
-                        "action": "sell",
-                        "qty": qty,
-                        "price": price,
-                        "revenue": total_revenue
-                    })
+                    self._record_trade(date, symbol, "sell", sell_qty, price, revenue=total_revenue)
                     
                     # Update positions and capital
-                    if qty == max_qty:
+                    if sell_qty == max_qty:
                         # Close position
+                        held[j] = False
+                        qty[j] = avg_price[j] = cost[j] = 0.0
                         del self.positions[symbol]
                     else:
-                        # Partial sell
-                        self.positions[symbol]["qty"] -= qty
-                        self.positions[symbol]["cost"] -= (qty / max_qty) * self.positions[symbol]["cost"]
+                        # Partial sell keeps the average price and the remaining share of the cost
+                        qty[j] -= sell_qty
+                        cost[j] *= 1.0 - sell_qty / max_qty
+                        self.positions[symbol] = {"qty": qty[j], "avg_price": avg_price[j], "cost": cost[j]}
                     
                     self.capital += total_revenue
         
-        # Calculate final portfolio value
-        final_portfolio_value = self.capital
-        for symbol, position in self.positions.items():
-            if symbol in current_prices:
-                final_portfolio_value += position["qty"] * current_prices[symbol]
+        return self._build_results(dates, pv)
+    
+    def run_signals(self,
+                    data: Dict[str, pd.DataFrame],
+                    actions: np.ndarray,
+                    quantities: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Run a backtest from precomputed signal matrices with a compiled loop
+        
+        Follows the same rules as run(), with the signals on each date applied
+        in symbol (column) order.
+        
+        Args:
+            data: Dictionary mapping symbols to DataFrames with historical data
+            actions: (dates x symbols) array of HOLD, BUY or SELL, laid out as
+                returned by align_prices()
+            quantities: (dates x symbols) array of order quantities; NaN means
+                1 share for buys and the whole position for sells (default: all NaN)
+            
+        Returns:
+            DataFrame with backtest results
+        """
+        dates, symbols, prices = self.align_prices(data)
+        actions = np.ascontiguousarray(actions, dtype=np.int8)
+        if quantities is None:
+            quantities = np.full(prices.shape, np.nan)
+        quantities = np.ascontiguousarray(quantities, dtype=np.float64)
+        if actions.shape != prices.shape or quantities.shape != prices.shape:
+            raise ValueError(f"Signal matrices must have shape {prices.shape}")
+        
+        # Carry existing positions into the compiled loop as arrays
+        held, qty, avg_price, cost = self._load_positions(symbols)
+        
+        (self.capital, pv, t_day, t_symbol, t_action, t_qty, t_price, t_amount) = _simulate(
+            prices, actions, quantities, float(self.capital), self.commission, self.slippage,
+            held, qty, avg_price, cost, int(np.count_nonzero(actions)))
+        
+        for j, symbol in enumerate(symbols):
+            if held[j]:
+                self.positions[symbol] = {"qty": qty[j], "avg_price": avg_price[j], "cost": cost[j]}
+            else:
+                self.positions.pop(symbol, None)
+        
+        is_buy = t_action == BUY
+        self.trades["date"].extend(dates[t_day])
+        self.trades["symbol"].extend(np.asarray(symbols, dtype=object)[t_symbol])
+        self.trades["action"].extend(np.where(is_buy, "buy", "sell").tolist())
+        self.trades["qty"].extend(t_qty.tolist())
+        self.trades["price"].frombytes(t_price.tobytes())
+        self.trades["cost"].frombytes(np.where(is_buy, t_amount, np.nan).tobytes())
+        self.trades["revenue"].frombytes(np.where(is_buy, np.nan, t_amount).tobytes())
         
+        return self._build_results(dates, pv)
+    
+    def _load_positions(self, symbols: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Copy the current positions in symbols into held/qty/avg_price/cost arrays"""
+        positions = [self.positions.get(symbol) for symbol in symbols]
+        held = np.array([p is not None for p in positions], dtype=np.bool_)
+        qty = np.array([p["qty"] if p else 0.0 for p in positions], dtype=np.float64)
+        avg_price = np.array([p["avg_price"] if p else 0.0 for p in positions], dtype=np.float64)
+        cost = np.array([p["cost"] if p else 0.0 for p in positions], dtype=np.float64)
+        return held, qty, avg_price, cost
+    
+    @staticmethod
+    def align_prices(data: Dict[str, pd.DataFrame]) -> Tuple[pd.DatetimeIndex, List[str], np.ndarray]:
+        """Align all symbols' closes on the union of their dates
+        
+        Args:
+            data: Dictionary mapping symbols to DataFrames with historical data
+            
+        Returns:
+            Tuple of (sorted dates, symbols, (dates x symbols) close matrix with
+            NaN where a symbol has no bar)
+        """
+        symbols = list(data.keys())
+        dates = reduce(lambda left, right: left.union(right), (df.index for df in data.values())).sort_values()
+        prices = np.full((len(dates), len(symbols)), np.nan)
+        for j, df in enumerate(data.values()):
+            # Integer row of each of the symbol's bars in the master index
+            rows = dates.get_indexer(df.index)
+            prices[rows, j] = df["close"].to_numpy(dtype=np.float64)
+        return dates, symbols, prices
+    
+    def _build_results(self, dates: pd.DatetimeIndex, pv: np.ndarray) -> pd.DataFrame:
+        """Wrap daily portfolio values in the results DataFrame"""
         # Create results DataFrame
-        results = pd.DataFrame(self.portfolio_history)
-        results.set_index("date", inplace=True)
+        self.portfolio_history = {"date": dates.to_numpy(), "portfolio_value": pv}
+        results = pd.DataFrame({"portfolio_value": pv}, index=pd.Index(dates, name="date"))
         
         # Calculate returns
-        results["daily_return"] = results["portfolio_value"].pct_change()
-        results["cumulative_return"] = (results["portfolio_value"] / self.initial_capital) - 1
+        daily_return = np.empty_like(pv)
+        daily_return[:1] = np.nan
+        daily_return[1:] = pv[1:] / pv[:-1] - 1
+        results["daily_return"] = daily_return
+        results["cumulative_return"] = pv / self.initial_capital - 1
         
         return results
     
+    def _record_trade(self,
+                      date: datetime,
+                      symbol: str,
+                      action: str,
+                      qty: float,
+                      price: float,
+                      cost: float = np.nan,
+                      revenue: float = np.nan) -> None:
+        """Append one trade to the columnar trade buffers"""
+        trades = self.trades
+        trades["date"].append(date)
+        trades["symbol"].append(symbol)
+        trades["action"].append(action)
+        trades["qty"].append(qty)
+        trades["price"].append(price)
+        trades["cost"].append(cost)
+        trades["revenue"].append(revenue)
+    
     def get_trade_history(self) -> pd.DataFrame:
         """Get trade history as a DataFrame
         
         Returns:
             DataFrame with trade history
         """
-        return pd.DataFrame(self.trades)
+        # Float columns are copied out of their buffers so later trades can still be appended
+        return pd.DataFrame({column: np.array(values, dtype=np.float64) if column in FLOAT_TRADE_COLUMNS else values
+                             for column, values in self.trades.items()})
     
     def get_stats(self, results: pd.DataFrame) -> Dict[str, float]:
         """Calculate performance statistics
@@ -190,7 +364,8 @@ class BacktestEngine:
         stats["total_return"] = results["cumulative_return"].iloc[-1]
         stats["annual_return"] = (1 + stats["total_return"]) ** (252 / len(results)) - 1
         stats["sharpe_ratio"] = results["daily_return"].mean() / results["daily_return"].std() * (252 ** 0.5)
-        stats["max_drawdown"] = (results["portfolio_value"] / results["portfolio_value"].cummax() - 1).min()
+        portfolio_value = results["portfolio_value"].to_numpy()
+        stats["max_drawdown"] = (portfolio_value / np.maximum.accumulate(portfolio_value) - 1).min()
         stats["final_portfolio_value"] = results["portfolio_value"].iloc[-1]
         
         # Trade stats
@@ -204,14 +379,17 @@ class BacktestEngine:
             
             # Simple estimate of winning trades - need proper P&L calculation per trade for accurate stats
             if not sell_trades.empty:
-                sell_trades["profit"] = sell_trades.apply(
-                    lambda x: x["revenue"] - (x["qty"] * self.positions.get(x["symbol"], {}).get("avg_price", 0)), 
-                    axis=1
-                )
-                stats["win_rate"] = (sell_trades["profit"] > 0).mean()
-                stats["average_profit"] = sell_trades["profit"].mean()
+                avg_price_map = {symbol: position["avg_price"] for symbol, position in self.positions.items()}
+                avg_price = sell_trades["symbol"].map(avg_price_map).fillna(0).to_numpy(dtype=np.float64)
+                profit = sell_trades["revenue"].to_numpy(dtype=np.float64) - sell_trades["qty"].to_numpy(dtype=np.float64) * avg_price
+                stats["win_rate"] = (profit > 0).mean()
+                stats["average_profit"] = profit.mean()
             else:
                 stats["win_rate"] = 0
                 stats["average_profit"] = 0
         
         return stats
+
+# Compile at import so the first backtest doesn't pay the JIT cost
+_simulate(np.ones((2, 1)), np.ones((2, 1), dtype=np.int8), np.full((2, 1), np.nan), 1.0, 0.0, 0.0,
+          np.zeros(1, dtype=np.bool_), np.zeros(1), np.zeros(1), np.zeros(1), 2)
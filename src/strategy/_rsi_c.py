@@ -0,0 +1,74 @@
+"""
+Optional C implementation of Wilder's RSI.
+The extension is compiled with cffi the first time it is imported and cached
+under ~/.cache/algotrader; later imports just load the shared library. If cffi
+or a C compiler is unavailable, lib is None and callers use the Python kernel.
+"""
+
+import hashlib
+import importlib.util
+import os
+
+_CDEF = "double rsi_wilder(const double *closes, int n, int period);"
+
+_SOURCE = r"""
+#include <math.h>
+
+double rsi_wilder(const double *closes, int n, int period)
+{
+    double avg_gain = 0.0, avg_loss = 0.0, delta, alpha, decay;
+    int i;
+
+    if (n <= period)
+        return NAN;
+    for (i = 1; i <= period; i++) {
+        delta = closes[i] - closes[i - 1];
+        if (delta > 0)
+            avg_gain += delta;
+        else
+            avg_loss -= delta;
+    }
+    alpha = 1.0 / period;
+    decay = (period - 1) * alpha;
+    avg_gain *= alpha;
+    avg_loss *= alpha;
+    for (i = period + 1; i < n; i++) {
+        delta = closes[i] - closes[i - 1];
+        avg_gain = avg_gain * decay + fmax(delta, 0.0) * alpha;
+        avg_loss = avg_loss * decay + fmax(-delta, 0.0) * alpha;
+    }
+    if (avg_loss == 0.0)
+        return avg_gain > 0.0 ? 100.0 : NAN;
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss);
+}
+"""
+
+_BUILD_DIR = os.path.join(os.path.expanduser("~"), ".cache", "algotrader")
+
+
+def _load():
+    try:
+        import cffi
+    except ImportError:
+        return None, None
+
+    # Key the module name on the source so edits trigger a rebuild
+    module_name = "_rsi_wilder_" + hashlib.sha1((_CDEF + _SOURCE).encode()).hexdigest()[:12]
+    try:
+        os.makedirs(_BUILD_DIR, exist_ok=True)
+        path = next((os.path.join(_BUILD_DIR, f) for f in os.listdir(_BUILD_DIR)
+                     if f.startswith(module_name + ".") and f.endswith((".so", ".pyd"))), None)
+        if path is None:
+            ffibuilder = cffi.FFI()
+            ffibuilder.cdef(_CDEF)
+            ffibuilder.set_source(module_name, _SOURCE)
+            path = ffibuilder.compile(tmpdir=_BUILD_DIR)
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.ffi, module.lib
+    except Exception:
+        return None, None
+
+
+ffi, lib = _load()
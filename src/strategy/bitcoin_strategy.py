@@ -2,10 +2,11 @@
 Bitcoin trading strategy implementation
 """
 
-import pandas as pd
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from typing import Dict, List, Optional, Union, Any
-import time
 
 from .base import Strategy
 from ..api.trading import AlpacaTradingClient
@@ -14,6 +15,9 @@ from ..api.market_data import AlpacaMarketDataClient
 class BitcoinStrategy(Strategy):
     """Bitcoin trading strategy based on moving average crossovers and volatility"""
     
+    # Number of hourly bars kept for the indicators
+    bar_limit = 500
+    
     def setup(self, 
              symbol: str = "BTC/USD", 
              fast_ma: int = 9, 
@@ -44,6 +48,13 @@ class BitcoinStrategy(Strategy):
         self.volatility_threshold = volatility_threshold
         self.position_size = position_size
         
+        # Bars cached between ticks; only newer bars are fetched each time
+        self._bars = deque(maxlen=self.bar_limit)
+        self._last_bar_ts = None
+        
+        # Reused across ticks for the concurrent account/positions/quote reads
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="bitcoin-strategy")
+        
         print(f"Bitcoin strategy initialized with {symbol}")
         print(f"Using {fast_ma}/{slow_ma} moving average crossover")
         
@@ -55,65 +66,49 @@ class BitcoinStrategy(Strategy):
             Dictionary mapping symbols to signals ('buy', 'sell', 'hold')
         """
         signals = {}
-        current_time = int(time.time())
-        
-        # Get historical data for the past 30 days with 1-hour bars
-        one_month_ago = current_time - (30 * 24 * 60 * 60)  # 30 days in seconds
         
         try:
-            # Format timestamps for API
-            start_time = pd.Timestamp(one_month_ago, unit='s').isoformat()
-            end_time = pd.Timestamp(current_time, unit='s').isoformat()
-            
             # Fetch bars data (crypto)
-            bars_data = self.market_data_client.get_crypto_bars(
-                symbols=[self.market_symbol],
-                timeframe="1Hour",
-                limit=500  # Get enough data for calculations
-            )
+            bars = self._update_bars()
             
             # Check if we got data
-            if self.market_symbol not in bars_data.get("bars", {}):
+            if not bars:
                 print(f"No data available for {self.market_symbol}")
                 signals[self.symbol] = "hold"
                 return signals
                 
             # Process data
-            bars = bars_data["bars"][self.market_symbol]
             if len(bars) < self.slow_ma + 5:  # Need enough data for MA calculation
                 print(f"Not enough data for {self.market_symbol} (got {len(bars)} bars)")
                 signals[self.symbol] = "hold"
                 return signals
                 
-            # Convert to pandas DataFrame for easier analysis
-            df = pd.DataFrame(bars)
-            
-            # Calculate moving averages
-            df['fast_ma'] = df['c'].rolling(window=self.fast_ma).mean()
-            df['slow_ma'] = df['c'].rolling(window=self.slow_ma).mean()
-            
-            # Calculate volume indicators
-            df['volume_ma'] = df['v'].rolling(window=self.volume_window).mean()
-            df['volume_ratio'] = df['v'] / df['volume_ma']
-            
-            # Calculate volatility (using rolling standard deviation)
-            df['volatility'] = df['c'].pct_change().rolling(window=self.volatility_window).std()
+            # Only the latest two values of each indicator are used, so work on the tail of the bars
+            n_closes = max(self.fast_ma, self.slow_ma, self.volatility_window) + 1
+            closes = np.fromiter((bar['c'] for bar in islice(reversed(bars), n_closes)), dtype=np.float64)[::-1]
+            volumes = np.fromiter((bar['v'] for bar in islice(reversed(bars), self.volume_window)), dtype=np.float64)[::-1]
             
             # Signal generation
             # 1. Check if fast MA crosses above slow MA
-            current_fast_ma = df['fast_ma'].iloc[-1]
-            current_slow_ma = df['slow_ma'].iloc[-1]
-            prev_fast_ma = df['fast_ma'].iloc[-2]
-            prev_slow_ma = df['slow_ma'].iloc[-2]
+            current_fast_ma = closes[-self.fast_ma:].mean()
+            current_slow_ma = closes[-self.slow_ma:].mean()
+            prev_fast_ma = closes[-self.fast_ma - 1:-1].mean()
+            prev_slow_ma = closes[-self.slow_ma - 1:-1].mean()
             
             bullish_crossover = prev_fast_ma < prev_slow_ma and current_fast_ma > current_slow_ma
             bearish_crossover = prev_fast_ma > prev_slow_ma and current_fast_ma < current_slow_ma
             
             # 2. Check volume confirmation
-            high_volume = df['volume_ratio'].iloc[-1] > 1.2  # Volume 20% above average
+            volume_ratio = volumes[-1] / volumes.mean() if len(volumes) == self.volume_window else np.nan
+            high_volume = volume_ratio > 1.2  # Volume 20% above average
             
             # 3. Check volatility (avoid trading during extreme volatility)
-            current_volatility = df['volatility'].iloc[-1]
+            # Sample standard deviation of the latest hourly returns
+            window = closes[-self.volatility_window - 1:]
+            if len(window) == self.volatility_window + 1:
+                current_volatility = np.std(np.diff(window) / window[:-1], ddof=1)
+            else:
+                current_volatility = np.nan
             excessive_volatility = current_volatility > self.volatility_threshold
             
             # Generate signal
@@ -132,6 +127,43 @@ class BitcoinStrategy(Strategy):
         
         return signals
     
+    def _fetch_bars(self, start: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Fetch hourly bars for the strategy's symbol, oldest first"""
+        bars_data = self.market_data_client.get_crypto_bars(
+            symbols=[self.market_symbol],
+            timeframe="1Hour",
+            limit=self.bar_limit,
+            start=start
+        )
+        return bars_data.get("bars", {}).get(self.market_symbol, [])
+    
+    def _update_bars(self) -> deque:
+        """Append bars newer than the cached ones to the bar cache
+        
+        Returns:
+            Deque of cached bars, oldest first
+        """
+        if self._last_bar_ts is None:
+            new_bars = self._fetch_bars()
+        else:
+            # The latest cached bar is fetched again since it may still have been forming
+            new_bars = self._fetch_bars(start=self._last_bar_ts)
+            if len(new_bars) >= self.bar_limit:
+                # Too far behind to fill the gap incrementally
+                self._bars.clear()
+                new_bars = self._fetch_bars()
+        
+        for bar in new_bars:
+            if self._bars and bar["t"] <= self._bars[-1]["t"]:
+                if bar["t"] == self._bars[-1]["t"]:
+                    self._bars[-1] = bar
+                continue
+            self._bars.append(bar)
+        
+        if self._bars:
+            self._last_bar_ts = self._bars[-1]["t"]
+        return self._bars
+    
     def execute(self, signals: Dict[str, str]) -> None:
         """Execute trades based on signals
         
@@ -139,15 +171,16 @@ class BitcoinStrategy(Strategy):
             signals: Dictionary mapping symbols to signals
         """
         try:
-            # Get account information
-            account = self.trading_client.get_account()
+            # Account, positions and the current price (crypto) are independent
+            # requests, so issue them concurrently over the clients' connection pools
+            account_future = self._executor.submit(self.trading_client.get_account)
+            positions_future = self._executor.submit(self.trading_client.get_positions_dict)
+            quote_future = self._executor.submit(self.market_data_client.get_crypto_latest_quote, [self.market_symbol])
+            account = account_future.result()
+            positions = positions_future.result()
+            latest_quote = quote_future.result()
             available_cash = float(account["cash"])
             
-            # Get current positions
-            positions = {p["symbol"]: p for p in self.trading_client.get_positions()}
-            
-            # Get current price (crypto)
-            latest_quote = self.market_data_client.get_crypto_latest_quote([self.market_symbol])
             if self.market_symbol not in latest_quote.get("quotes", {}):
                 print(f"Could not get latest quote for {self.market_symbol}")
                 return
@@ -1,4 +1,40 @@
-import pandas as pd
+import numpy as np
+
+from ..utils.jit import NUMBA_AVAILABLE, njit
+
+if NUMBA_AVAILABLE:
+    _c_ffi = _c_lib = None
+else:
+    # Without numba, fall back to a compiled C kernel when one can be built
+    from ._rsi_c import ffi as _c_ffi, lib as _c_lib
+
+@njit(cache=True)
+def _rsi_wilder(closes, period):
+    # Wilder's RSI: seed the averages with a simple mean over the first period,
+    # then smooth with avg = (avg * (period - 1) + x) / period, written as
+    # multiplies by precomputed factors so the loop has no divides or branches
+    n = closes.shape[0]
+    if n <= period:
+        return np.nan
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        delta = closes[i] - closes[i - 1]
+        if delta > 0:
+            avg_gain += delta
+        else:
+            avg_loss -= delta
+    alpha = 1.0 / period
+    decay = (period - 1) * alpha
+    avg_gain *= alpha
+    avg_loss *= alpha
+    for i in range(period + 1, n):
+        delta = closes[i] - closes[i - 1]
+        avg_gain = avg_gain * decay + max(delta, 0.0) * alpha
+        avg_loss = avg_loss * decay + max(-delta, 0.0) * alpha
+    if avg_loss == 0.0:
+        return 100.0 if avg_gain > 0.0 else np.nan
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
 
 class RSIStrategy:
     def __init__(self, trading_client, fetch_closes_func, symbol, rsi_period=14, overbought=69, oversold=30):
@@ -10,19 +46,15 @@ class RSIStrategy:
         self.oversold = oversold
 
     def calculate_rsi(self, closes):
-        # Calculate RSI using pandas
-        delta = closes.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        # Latest RSI using Wilder's smoothing
+        closes = np.ascontiguousarray(closes, dtype=np.float64)
+        if _c_lib is not None:
+            return _c_lib.rsi_wilder(_c_ffi.from_buffer("double[]", closes), len(closes), self.rsi_period)
+        return _rsi_wilder(closes, self.rsi_period)
 
     def generate_signal(self):
         closes = self.fetch_closes_func(self.symbol)
-        closes = pd.Series(closes)
-        rsi = self.calculate_rsi(closes)
-        latest_rsi = rsi.iloc[-1]
+        latest_rsi = self.calculate_rsi(closes)
         print(f"Latest RSI({self.rsi_period}) for {self.symbol}: {latest_rsi:.2f}")
         if latest_rsi < self.oversold:
             return 'buy', latest_rsi
@@ -33,4 +65,7 @@ class RSIStrategy:
 
     def run(self):
         signal, rsi_value = self.generate_signal()
-        return signal, rsi_value 
\ No newline at end of file
+        return signal, rsi_value
+
+# Compile at import so the first strategy tick doesn't pay the JIT cost
+_rsi_wilder(np.zeros(30, dtype=np.float64), 14)
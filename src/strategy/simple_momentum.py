@@ -4,6 +4,7 @@ Simple momentum strategy implementation
 
 import pandas as pd
 import numpy as np
+from datetime import date, timedelta
 from typing import Dict, List, Optional, Union, Any
 
 from .base import Strategy
@@ -32,41 +33,33 @@ class SimpleMomentum(Strategy):
         Returns:
             Dictionary mapping symbols to signals ('buy', 'sell', 'hold')
         """
-        signals = {}
+        # Every symbol holds unless it has a full lookback window with significant momentum
+        signals = dict.fromkeys(self.symbols, "hold")
         
-        # Get historical data for all symbols
-        bars_data = self.market_data_client.get_stock_bars(
+        # Get historical data for all symbols, starting far enough back in calendar
+        # days to cover the lookback window in trading days
+        start = date.today() - timedelta(days=self.lookback_days * 7 // 5 + 10)
+        bars_by_symbol = self.market_data_client.get_bars_batch(
             symbols=self.symbols,
             timeframe="1Day",
-            limit=self.lookback_days
+            start=start.isoformat()
         )
         
-        # Calculate momentum for each symbol
-        for symbol in self.symbols:
-            if symbol not in bars_data.get("bars", {}):
-                signals[symbol] = "hold"
-                continue
-                
-            bars = bars_data["bars"][symbol]
-            if len(bars) < self.lookback_days:
-                signals[symbol] = "hold"
-                continue
-                
-            # Extract closing prices
-            closes = [bar["c"] for bar in bars]
-            
-            # Calculate momentum (percentage change over the lookback period)
-            start_price = closes[0]
-            end_price = closes[-1]
-            momentum = (end_price - start_price) / start_price
-            
-            # Generate signal based on momentum
-            if momentum > self.momentum_threshold:
-                signals[symbol] = "buy"
-            elif momentum < -self.momentum_threshold:
-                signals[symbol] = "sell"
-            else:
-                signals[symbol] = "hold"
+        # Only the first and last close of each window are needed
+        symbols = [symbol for symbol in self.symbols
+                   if len(bars_by_symbol.get(symbol, ())) >= self.lookback_days]
+        if not symbols:
+            return signals
+        start_prices = np.array([bars_by_symbol[symbol][-self.lookback_days]["c"] for symbol in symbols], dtype=np.float64)
+        end_prices = np.array([bars_by_symbol[symbol][-1]["c"] for symbol in symbols], dtype=np.float64)
+        
+        # Calculate momentum (percentage change over the lookback period)
+        momentum = (end_prices - start_prices) / start_prices
+        
+        # Generate signals based on momentum
+        actions = np.where(momentum > self.momentum_threshold, "buy",
+                           np.where(momentum < -self.momentum_threshold, "sell", "hold"))
+        signals.update(zip(symbols, actions.tolist()))
         
         return signals
     
@@ -77,27 +70,34 @@ class SimpleMomentum(Strategy):
             signals: Dictionary mapping symbols to signals
         """
         # Get current positions
-        positions = {p["symbol"]: p for p in self.trading_client.get_positions()}
+        positions = self.trading_client.get_positions_dict()
         
+        orders = []
         for symbol, signal in signals.items():
             if signal == "buy" and symbol not in positions:
                 # Buy if we don't already have a position
-                self.trading_client.submit_order(
-                    symbol=symbol,
-                    qty="1",  # Can be adjusted based on portfolio size/risk
-                    side="buy",
-                    type="market",
-                    time_in_force="day"
-                )
-                print(f"Buying {symbol}")
+                orders.append({
+                    "symbol": symbol,
+                    "qty": "1",  # Can be adjusted based on portfolio size/risk
+                    "side": "buy",
+                    "type": "market",
+                    "time_in_force": "day"
+                })
                 
             elif signal == "sell" and symbol in positions:
                 # Sell if we have a position
-                self.trading_client.submit_order(
-                    symbol=symbol,
-                    qty=positions[symbol]["qty"],
-                    side="sell",
-                    type="market",
-                    time_in_force="day"
-                )
-                print(f"Selling {symbol}")
+                orders.append({
+                    "symbol": symbol,
+                    "qty": positions[symbol]["qty"],
+                    "side": "sell",
+                    "type": "market",
+                    "time_in_force": "day"
+                })
+        
+        # Submit all orders concurrently rather than one round-trip per symbol
+        results = self.trading_client.submit_orders(orders, return_exceptions=True)
+        for order, result in zip(orders, results):
+            if isinstance(result, Exception):
+                print(f"Error submitting {order['side']} order for {order['symbol']}: {result}")
+            else:
+                print(f"{'Buying' if order['side'] == 'buy' else 'Selling'} {order['symbol']}")
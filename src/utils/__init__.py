@@ -0,0 +1 @@
+# Utilities package initialization
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+Time-bounded caching of API client responses.
+"""
+
+import functools
+import time
+from typing import Any, Callable
+
+
+def _freeze(value: Any) -> Any:
+    """Make list arguments usable as part of a cache key"""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def ttl_cache(ttl_seconds: float) -> Callable:
+    """Cache a method's return value per instance and arguments for ttl_seconds
+
+    Entries live in the instance's ``_ttl_cache`` dictionary, which the
+    instance must create in ``__init__`` and can clear to invalidate.
+    Cached values are shared between callers and must be treated as read-only.
+
+    Args:
+        ttl_seconds: How long a cached value stays valid
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (func.__name__,
+                   tuple(_freeze(a) for a in args),
+                   tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+            now = time.monotonic()
+            cached = self._ttl_cache.get(key)
+            if cached is not None and now - cached[0] < ttl_seconds:
+                return cached[1]
+            value = func(self, *args, **kwargs)
+            self._ttl_cache[key] = (now, value)
+            return value
+
+        return wrapper
+
+    return decorator
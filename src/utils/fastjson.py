@@ -0,0 +1,42 @@
+"""
+Optional fast JSON support.
+Uses orjson when it is installed and falls back to the standard library.
+Both backends accept NumPy scalars and arrays, so callers behave the same
+whichever one is installed.
+"""
+
+from typing import Any
+
+
+def _default(obj: Any) -> Any:
+    """Convert NumPy scalars/arrays (anything with tolist) to plain Python values"""
+    tolist = getattr(obj, "tolist", None)
+    if tolist is None:
+        raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+    return tolist()
+
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+
+    def loads(data: Any) -> Any:
+        """Deserialize JSON from bytes or str"""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize obj to compact JSON bytes"""
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    import json
+
+    ORJSON_AVAILABLE = False
+
+    def loads(data: Any) -> Any:
+        """Deserialize JSON from bytes or str"""
+        return json.loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize obj to compact JSON bytes"""
+        return json.dumps(obj, separators=(",", ":"), default=_default).encode("utf-8")
@@ -0,0 +1,29 @@
+"""
+Retry policy and timeouts shared by the HTTP API clients.
+"""
+
+import random
+
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout in seconds for every API request
+REQUEST_TIMEOUT = (3.05, 10)
+
+
+class JitteredRetry(Retry):
+    """urllib3 Retry with jittered backoff that never replays a processed POST
+
+    Backoff sleeps are scaled by a random factor in [0.5, 1) so clients that
+    were throttled together do not retry in lockstep. POST stays out of the
+    retryable methods, so an order that timed out or failed with a 5xx (and may
+    have been accepted) is never sent twice; only a 429, which is rejected
+    before processing, is retried for POST.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method and method.upper() == "POST":
+            return status_code == 429
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_backoff_time(self) -> float:
+        return super().get_backoff_time() * random.uniform(0.5, 1.0)